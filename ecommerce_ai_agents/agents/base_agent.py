@@ -1,57 +1,148 @@
 import ollama
 import json
+import threading
 import time
+from .model_profiles import get_profile, profile_stats, in_flight
+from .deadline import DeadlineExceeded
+
+# Per-thread generation state: whether the thread runs batch work, and the model
+# that answered its most recent completion
+_thread_state = threading.local()
+
+
+def begin_batch_call():
+    """Mark the current thread as batch work and forget its last model
+
+    Batch generations are already bounded by the batch pool, so they skip the
+    shared in-flight slots: they neither push interactive traffic onto the
+    fallback model nor fall back themselves.
+    """
+    _thread_state.batch = True
+    _thread_state.model = None
+
+
+def last_model():
+    """Model used by the current thread's most recent completion, or None"""
+    return getattr(_thread_state, 'model', None)
+
 
 class BaseAgent:
     """Base class for all AI agents"""
-    def __init__(self, model="gemma:2b"):
-        self.model = model
-    
-    def get_completion(self, prompt, system_prompt=None):
-        """Get completion from Ollama API with retries"""
+    def __init__(self, model=None, profile="default"):
+        # Model and generation options come from config/model_profiles.json
+        self.profile = get_profile(profile)
+        self.model = model or self.profile['model']
+        self.options = self.profile['options']
+
+    def acquire_model(self):
+        """Pick the model for one generation and return (model, slot)
+
+        Profiles with a fallback model and max_in_flight take one of max_in_flight
+        slots shared by all workers; when none is free the fallback model is used.
+        """
+        fallback_model = self.profile.get('fallback_model')
+        max_in_flight = self.profile.get('max_in_flight')
+        if not (fallback_model and max_in_flight) or getattr(_thread_state, 'batch', False):
+            return self.model, None
+        slot = in_flight.acquire(self.profile['name'], max_in_flight)
+        return (self.model if slot is not None else fallback_model), slot
+
+    def get_completion(self, prompt, system_prompt=None, deadline=None):
+        """Get completion from Ollama API with retries
+
+        With a deadline the reply is streamed and the deadline is checked after every
+        chunk, so the budget covers the whole call rather than each httpx phase
+        separately. When time runs out the stream and its connection are closed,
+        which stops the generation, and DeadlineExceeded is raised instead of
+        returning the canned error.
+        """
         max_retries = 3
         retry_delay = 1  # seconds
-        
+
         messages = []
         if system_prompt:
             messages.append({
                 'role': 'system',
                 'content': system_prompt
             })
-            
+
         messages.append({
             'role': 'user',
             'content': prompt
         })
-        
-        for attempt in range(max_retries):
-            try:
-                print(f"Sending to Ollama ({self.model}):")
-                print(f"Prompt: {prompt}")
-                if system_prompt:
-                    print(f"System: {system_prompt}")
-                
-                response = ollama.chat(
-                    model=self.model,
-                    messages=messages,
-                    options={
-                        'temperature': 0.7,
-                        'num_ctx': 2048,
-                    }
-                )
-                
-                result = response['message']['content'].strip()
-                print(f"Ollama response: {result}")
-                return result
-                
-            except Exception as e:
-                print(f"Error getting completion (attempt {attempt+1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                else:
-                    return "I'm having trouble processing your request right now. Please try again later."
-
-    def process(self, user_id, message):
+
+        profile_name = self.profile['name']
+        model, slot = self.acquire_model()
+        _thread_state.model = model
+        try:
+            for attempt in range(max_retries):
+                if deadline:
+                    deadline.check()
+                try:
+                    print(f"Sending to Ollama ({model}, profile: {profile_name}):")
+                    print(f"Prompt: {prompt}")
+                    if system_prompt:
+                        print(f"System: {system_prompt}")
+
+                    start = time.perf_counter()
+                    if deadline:
+                        response = self._chat_with_deadline(model, messages, deadline)
+                    else:
+                        response = ollama.chat(
+                            model=model,
+                            messages=messages,
+                            options=self.options
+                        )
+
+                    # Ollama reports token counts alongside the message
+                    profile_stats.record(
+                        profile_name,
+                        model,
+                        time.perf_counter() - start,
+                        response.get('prompt_eval_count'),
+                        response.get('eval_count'),
+                        fallback=model != self.model
+                    )
+
+                    result = response['message']['content'].strip()
+                    print(f"Ollama response: {result}")
+                    return result
+
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    print(f"Error getting completion (attempt {attempt+1}/{max_retries}): {e}")
+                    if deadline and deadline.remaining() <= retry_delay:
+                        # No time left for another backoff and attempt
+                        raise DeadlineExceeded("Request deadline exceeded during completion") from e
+                    if attempt < max_retries - 1:
+                        time.sleep(retry_delay)
+                        retry_delay *= 2  # Exponential backoff
+                    else:
+                        return "I'm having trouble processing your request right now. Please try again later."
+        finally:
+            in_flight.release(slot)
+
+    def _chat_with_deadline(self, model, messages, deadline):
+        """Stream a chat completion, abandoning it once the deadline has passed"""
+        # httpx applies the timeout to each connect/read/write separately, so it only
+        # bounds a stall; the overall budget is enforced between chunks below
+        client = ollama.Client(timeout=deadline.remaining())
+        try:
+            content = []
+            final = {}
+            stream = client.chat(model=model, messages=messages, options=self.options, stream=True)
+            for part in stream:
+                content.append(part['message']['content'])
+                if part.get('done'):
+                    final = part
+                elif deadline.expired():
+                    stream.close()
+                    raise DeadlineExceeded("Request deadline exceeded during generation")
+            return dict(final, message={'role': 'assistant', 'content': ''.join(content)})
+        finally:
+            client._client.close()
+
+    def process(self, user_id, message, deadline=None):
         """Process user message - to be implemented by child classes"""
-        raise NotImplementedError("Subclasses must implement this method")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement this method")
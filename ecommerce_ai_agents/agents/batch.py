@@ -0,0 +1,181 @@
+# agents/batch.py
+"""
+Offline processing of many chat messages at once.
+
+Messages are processed in chunks. Within a chunk they are classified (one
+model call per distinct message), grouped by intent, and the database lookups
+for each group are done in bulk: orders for all order_status users in one
+query, and one product search per distinct message. Agent responses are then
+generated with bounded parallelism and yielded as each one completes, so
+results stream out chunk by chunk. Batch generations use each profile's
+primary model and bypass the in-flight slots shared with /api/chat, so the
+model recorded in every response is the one that answered.
+
+    python -m agents.batch messages.jsonl > results.jsonl
+
+where each input line is {"userId": "...", "message": "..."}.
+"""
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .base_agent import begin_batch_call, last_model
+
+GENERAL_RESPONSE = {
+    "message": "I'm not sure what you're looking for. Would you like to browse products, check an order, or get customer support?",
+    "suggestions": ["Show me popular products", "Where is my order?", "I need help with a return"]
+}
+
+
+def numeric_user_id(user_id):
+    """Same mapping as /api/chat: anonymous or non-numeric ids become user 1"""
+    user_id = str(user_id)
+    return int(user_id) if user_id.isdigit() else 1
+
+
+def elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+class BatchChatProcessor:
+    """Runs many (userId, message) pairs through the agents"""
+    def __init__(self, intent_recognizer, product_agent, order_agent, support_agent, max_workers=4):
+        self.intent_recognizer = intent_recognizer
+        self.product_agent = product_agent
+        self.order_agent = order_agent
+        self.support_agent = support_agent
+        self.max_workers = max_workers
+
+    def _safely(self, func, *args):
+        """Call func, returning (result, error message, elapsed ms) instead of raising"""
+        start = time.perf_counter()
+        try:
+            return func(*args), None, elapsed_ms(start)
+        except Exception as e:
+            print(f"Error in batch step {getattr(func, '__name__', func)}: {e}")
+            return None, str(e), elapsed_ms(start)
+
+    def _classify(self, message):
+        begin_batch_call()
+        return self._safely(self.intent_recognizer.recognize, message)
+
+    def _respond(self, intent, user_id, message, orders, products):
+        begin_batch_call()
+        start = time.perf_counter()
+        if intent == 'product_search':
+            response = self.product_agent.process(user_id, message, products=products)
+        elif intent == 'order_status':
+            response = self.order_agent.process(user_id, message, orders=orders)
+        elif intent == 'customer_support':
+            response = self.support_agent.process(user_id, message)
+        else:
+            response = dict(GENERAL_RESPONSE)
+        # None when no model was called, e.g. for the general response
+        response["model"] = last_model()
+        return response, elapsed_ms(start)
+
+    def run(self, items, chunk_size=100):
+        """Yield one result dict per item
+
+        Items are handled in chunks so results start streaming after the first
+        chunk instead of after the whole batch has been classified. Within a chunk
+        results come in completion order. A failure in any step becomes an "error"
+        on the affected items only.
+        """
+        batch_start = time.perf_counter()
+        # Cached across chunks: message -> (intent, error, ms), message -> (products, error, ms)
+        intents = {}
+        product_searches = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for chunk_start in range(0, len(items), chunk_size):
+                requests = []
+                for index, item in enumerate(items[chunk_start:chunk_start + chunk_size], chunk_start):
+                    user_id, message = item.get('userId', 'anonymous'), item.get('message', '')
+                    if not isinstance(message, str):
+                        yield {"index": index, "userId": user_id, "intent": None, "error": "message must be a string",
+                               "timings": {"since_batch_start_ms": elapsed_ms(batch_start)}}
+                        continue
+                    requests.append((index, user_id, message))
+
+                # Classify each distinct message once
+                messages = [message for message in dict.fromkeys(message for _, _, message in requests) if message not in intents]
+                for message, outcome in zip(messages, pool.map(self._classify, messages)):
+                    intents[message] = outcome
+
+                # Bulk lookups for the chunk's intent groups
+                order_users = {numeric_user_id(user_id) for _, user_id, message in requests if intents[message][0] == 'order_status'}
+                orders_by_user, orders_error, orders_ms = (
+                    self._safely(self.order_agent.get_orders_for_users, order_users) if order_users else ({}, None, 0.0))
+
+                product_messages = [message for message in messages if intents[message][0] == 'product_search']
+                for message, outcome in zip(product_messages, pool.map(lambda message: self._safely(self.product_agent.search_products, message), product_messages)):
+                    product_searches[message] = outcome
+
+                futures = {}
+                for index, user_id, message in requests:
+                    intent, intent_error, intent_ms = intents[message]
+                    result = {"index": index, "userId": user_id, "intent": intent,
+                              "timings": {"intent_ms": intent_ms, "lookup_ms": 0.0, "response_ms": None}}
+                    if intent == 'order_status':
+                        lookup_error, result["timings"]["lookup_ms"] = orders_error, orders_ms
+                        lookup = (orders_by_user or {}).get(numeric_user_id(user_id), [])
+                    elif intent == 'product_search':
+                        lookup, lookup_error, result["timings"]["lookup_ms"] = product_searches[message]
+                    else:
+                        lookup, lookup_error = None, None
+
+                    error = intent_error or lookup_error
+                    if error:
+                        result["error"] = error
+                        result["timings"]["since_batch_start_ms"] = elapsed_ms(batch_start)
+                        yield result
+                        continue
+
+                    future = pool.submit(self._respond, intent, numeric_user_id(user_id), message,
+                                         lookup if intent == 'order_status' else None,
+                                         lookup if intent == 'product_search' else None)
+                    futures[future] = result
+
+                for future in as_completed(futures):
+                    result = futures[future]
+                    try:
+                        result["response"], result["timings"]["response_ms"] = future.result()
+                    except Exception as e:
+                        print(f"Error processing batch item {result['index']}: {e}")
+                        result["error"] = str(e)
+                    result["timings"]["since_batch_start_ms"] = elapsed_ms(batch_start)
+                    yield result
+
+
+def build_processor(max_workers=4):
+    """Create a processor with fresh agent instances"""
+    from .intent_recognizer import IntentRecognizer
+    from .product_recommendation import ProductRecommendationAgent
+    from .order_tracking import OrderTrackingAgent
+    from .customer_support import CustomerSupportAgent
+
+    return BatchChatProcessor(IntentRecognizer(), ProductRecommendationAgent(), OrderTrackingAgent(),
+                              CustomerSupportAgent(), max_workers=max_workers)
+
+
+if __name__ == '__main__':
+    import argparse
+    from utils.serialization import encode
+
+    parser = argparse.ArgumentParser(description="Process a JSON lines file of chat messages")
+    parser.add_argument('input', help="JSON lines file with userId and message per line ('-' for stdin)")
+    parser.add_argument('--workers', type=int, default=4, help="Maximum parallel model calls")
+    parser.add_argument('--fields', default=None, help="Response projection, e.g. 'compact'")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    items = [json.loads(line) for line in source if line.strip()]
+
+    # Keep stdout for results; agents log with print
+    out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    for result in build_processor(args.workers).run(items):
+        out.write(encode(result, args.fields) + b"\n")
+        out.flush()
@@ -1,27 +1,35 @@
 
 # agents/customer_support.py
 from .base_agent import BaseAgent
+from .deadline import DeadlineExceeded, degraded_responses
+from utils.catalog_snapshot import catalog_snapshot
 import json
 
 class CustomerSupportAgent(BaseAgent):
     """Agent for customer support"""
     def __init__(self):
-        super().__init__()
+        super().__init__(profile="customer_support")
         self.system_prompt = """
         You are a customer support assistant for an e-commerce website.
         Your job is to help users with issues like returns, refunds, product problems, and general inquiries.
         Be empathetic, helpful, and solutions-oriented.
         For complex problems, suggest connecting with a human representative when appropriate.
         """
-        # Load support FAQ data
-        try:
-            with open('data/support_faq.json', 'r') as f:
-                self.faq = json.load(f)
-        except:
-            self.faq = []
+        # FAQ data is read from the shared catalog snapshot when available,
+        # so only load a private copy when there is none
+        self.faq = []
+        if not catalog_snapshot.get():
+            try:
+                with open('data/support_faq.json', 'r') as f:
+                    self.faq = json.load(f)
+            except:
+                self.faq = []
     
     def search_faq(self, query):
         """Search FAQs for relevant information"""
+        snapshot = catalog_snapshot.get()
+        if snapshot:
+            return snapshot.search_faq(query)
         if not self.faq:
             return None
             
@@ -31,7 +39,7 @@ class CustomerSupportAgent(BaseAgent):
                 return item['answer']
         return None
     
-    def process(self, user_id, message):
+    def process(self, user_id, message, deadline=None):
         # Check FAQ for quick answers
         faq_answer = self.search_faq(message)
         
@@ -42,10 +50,17 @@ class CustomerSupportAgent(BaseAgent):
         
         # Generate response
         prompt = f"User support request: {message}\n\n{context}Provide a helpful customer support response."
-        ai_response = self.get_completion(prompt, self.system_prompt)
+        degraded = False
+        try:
+            ai_response = self.get_completion(prompt, self.system_prompt, deadline=deadline)
+        except DeadlineExceeded:
+            degraded = True
+            degraded_responses.increment("customer_support")
+            ai_response = faq_answer or "Sorry, this is taking longer than expected. Our support team can help you right away."
         
         return {
             "message": ai_response,
             "suggested_actions": ["Contact support team", "Check order status", "Start return process"],
-            "agent_type": "customer_support"
+            "agent_type": "customer_support",
+            "degraded": degraded
         }
\ No newline at end of file
@@ -0,0 +1,51 @@
+# agents/deadline.py
+import threading
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of its time budget"""
+    pass
+
+
+class Deadline:
+    """Absolute time budget for one chat request, passed down to the agents"""
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def capped(self, seconds):
+        """Return a sub-deadline that ends after `seconds` or with this one, whichever is first"""
+        child = Deadline(seconds)
+        child.expires_at = min(child.expires_at, self.expires_at)
+        return child
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded("Request deadline exceeded")
+
+
+class DegradedCounter:
+    """Counts responses that were returned without a model completion"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def increment(self, agent_type):
+        with self._lock:
+            self._counts[agent_type] = self._counts.get(agent_type, 0) + 1
+
+    def summary(self):
+        with self._lock:
+            return {
+                "degraded_responses": sum(self._counts.values()),
+                "by_agent": dict(self._counts),
+            }
+
+
+degraded_responses = DegradedCounter()
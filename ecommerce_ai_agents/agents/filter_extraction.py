@@ -0,0 +1,168 @@
+# agents/filter_extraction.py
+import re
+import string
+
+# Punctuation removed from words before matching, as re.sub(r'[^\w\s]', '', word) would
+# ("_" counts as a word character, so it stays)
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation.replace('_', ''))
+_NON_WORD = re.compile(r'[^\w\s]')
+
+# "$50", "50", "49.99", "$1k", "1,000"
+_PRICE = re.compile(r'\$?(\d[\d,]*(?:\.\d+)?)(k?)\b')
+
+# Larger prices are ignored rather than filtered on
+MAX_PRICE_VALUE = 10 ** 9
+
+# Words never used as search terms
+SKIP_WORDS = frozenset([
+    "show", "display", "find", "looking", "for", "me", "want", "need", "products", "items",
+    "under", "over", "between", "and", "less", "than", "more", "cheap", "expensive",
+    "newest", "popular", "best"
+])
+
+# Phrases that introduce an upper price bound, e.g. "under $50"
+MAX_PRICE_PHRASES = ["under", "less than", "below", "cheaper than"]
+
+# Sort and view keywords. When several match, the earlier value in each list wins.
+SORT_KEYWORDS = [
+    ("price-asc", ["cheap", "cheaper", "cheapest", "cheaply", "inexpensive", "lowest price", "price low"]),
+    ("price-desc", ["expensive", "highest price", "price high"]),
+    ("newest", ["newest", "latest", "recent", "recently"]),
+    ("rating", ["popular", "popularity", "best rated", "top rated"]),
+]
+VIEW_KEYWORDS = [
+    ("compact", ["compact", "list"]),
+    ("grid", ["grid", "tiles"]),
+]
+
+# Used when the database has no category_synonyms table
+DEFAULT_CATEGORY_SYNONYMS = {
+    "books": ["book", "novel", "novels", "ebook", "ebooks"],
+    "fashion": ["clothes", "clothing", "apparel", "shirts", "dresses", "shoes"],
+    "fitness": ["gym", "workout", "exercise", "yoga"],
+    "electronics": ["electronic", "gadgets", "tech", "headphones", "laptops", "phones"],
+    "home-decor": ["decor", "furniture", "homeware"],
+    "beauty": ["makeup", "skincare", "cosmetics"],
+}
+
+_END = object()
+
+
+def clean_word(word):
+    """Strip punctuation from one whitespace-separated word"""
+    if word.isalnum():
+        return word
+    if word.isascii():
+        return word.translate(_PUNCTUATION_TABLE)
+    return _NON_WORD.sub('', word)
+
+
+def parse_price(word):
+    """Parse a price token such as "$50", "49.99" or "$1k" into an int, or None"""
+    match = _PRICE.match(word)
+    if not match:
+        return None
+    # Integer arithmetic throughout, so long digit runs neither overflow nor lose precision
+    whole, _, fraction = match.group(1).replace(',', '').partition('.')
+    if len(whole) > len(str(MAX_PRICE_VALUE)):
+        return None
+    value = int(whole)
+    if match.group(2):
+        value = value * 1000 + int((fraction + "000")[:3])
+    return value if value <= MAX_PRICE_VALUE else None
+
+
+class FilterExtractor:
+    """Single-pass filter extraction over a token trie
+
+    All phrases (category names, synonyms, price lead-ins, sort and view
+    keywords) live in one trie keyed by cleaned words. The message is split
+    once and every position is walked through the trie, collecting each
+    phrase that ends along the way, so overlapping phrases such as "cheaper"
+    and "cheaper than" both fire.
+    """
+    def __init__(self, categories, synonyms=None):
+        self.trie = {}
+        # Categories are reported in catalog order, as before
+        self.category_order = {category['slug']: index for index, category in enumerate(categories)}
+
+        for category in categories:
+            self._add(category['name'], ("category", category['slug']))
+        for slug, terms in (synonyms or {}).items():
+            if slug in self.category_order:
+                for term in terms:
+                    self._add(term, ("category", slug))
+
+        for phrase in MAX_PRICE_PHRASES:
+            self._add(phrase, ("max_price", None))
+        self._add("between", ("between", None))
+
+        for priority, (value, phrases) in enumerate(SORT_KEYWORDS):
+            for phrase in phrases:
+                self._add(phrase, ("sort", (priority, value)))
+        for priority, (value, phrases) in enumerate(VIEW_KEYWORDS):
+            for phrase in phrases:
+                self._add(phrase, ("view", (priority, value)))
+
+    def _add(self, phrase, action):
+        node = self.trie
+        for word in phrase.lower().split():
+            node = node.setdefault(clean_word(word), {})
+        node.setdefault(_END, []).append(action)
+
+    def extract(self, message):
+        """Extract filtering criteria from user message"""
+        raw_words = message.lower().split()
+        words = [clean_word(word) for word in raw_words]
+        filter_command = {"action": "filter"}
+
+        categories = set()
+        sorts = []
+        views = []
+        max_price = None
+        price_range = None
+
+        trie = self.trie
+        count = len(words)
+        for start in range(count):
+            node = trie.get(words[start])
+            end = start + 1
+            while node is not None:
+                for kind, value in node.get(_END, ()):
+                    if kind == "category":
+                        categories.add(value)
+                    elif kind == "sort":
+                        sorts.append(value)
+                    elif kind == "view":
+                        views.append(value)
+                    elif kind == "max_price" and max_price is None and end < count:
+                        max_price = parse_price(raw_words[end])
+                    elif kind == "between" and price_range is None and end + 2 < count and words[end + 1] == "and":
+                        low, high = parse_price(raw_words[end]), parse_price(raw_words[end + 2])
+                        if low is not None and high is not None:
+                            price_range = [low, high]
+                if end == count:
+                    break
+                node = node.get(words[end])
+                end += 1
+
+        if categories:
+            filter_command["categories"] = sorted(categories, key=self.category_order.get)
+
+        # An explicit range takes precedence over an upper bound
+        if price_range:
+            filter_command["priceRange"] = price_range
+        elif max_price is not None:
+            filter_command["priceRange"] = [0, max_price]
+
+        if sorts:
+            filter_command["sort"] = min(sorts)[1]
+
+        search_terms = [word for word in words if len(word) > 2 and word not in SKIP_WORDS]
+        if search_terms:
+            filter_command["search"] = " ".join(search_terms)
+
+        if views:
+            filter_command["view"] = min(views)[1]
+
+        return filter_command
@@ -0,0 +1,168 @@
+# agents/model_profiles.py
+import json
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Used when the config file is missing or does not mention an agent
+DEFAULT_PROFILE = {
+    "model": "gemma:2b",
+    "options": {
+        "temperature": 0.7,
+        "num_ctx": 2048,
+    },
+    "fallback_model": None,
+    "max_in_flight": None,
+}
+
+PROFILES_PATH = os.environ.get('MODEL_PROFILES_PATH', 'config/model_profiles.json')
+
+# Slot lock files shared by all workers on this host
+INFLIGHT_DIR = os.environ.get('MODEL_INFLIGHT_DIR', os.path.join(tempfile.gettempdir(), 'smartstore-inflight'))
+
+_profiles_cache = None
+
+
+def load_profiles(path=None):
+    """Load the per-agent model profiles from the JSON config file"""
+    global _profiles_cache
+    if path is None and _profiles_cache is not None:
+        return _profiles_cache
+
+    try:
+        with open(path or PROFILES_PATH, 'r') as f:
+            profiles = json.load(f)
+    except Exception as e:
+        print(f"Could not load model profiles ({e}), using defaults")
+        profiles = {}
+
+    if path is None:
+        _profiles_cache = profiles
+    return profiles
+
+
+def get_profile(name, path=None):
+    """Resolve a profile by name, layered as built-in default -> "default" entry -> named entry"""
+    profiles = load_profiles(path)
+    resolved = dict(DEFAULT_PROFILE)
+    resolved['options'] = dict(DEFAULT_PROFILE['options'])
+
+    for layer in (profiles.get('default', {}), profiles.get(name, {})):
+        for key, value in layer.items():
+            if key == 'options':
+                resolved['options'].update(value)
+            else:
+                resolved[key] = value
+
+    resolved['name'] = name
+    return resolved
+
+
+class ProfileStats:
+    """Thread-safe latency and token counters, keyed by profile and model"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, profile_name, model, latency, prompt_tokens, completion_tokens, fallback=False):
+        key = (profile_name, model)
+        with self._lock:
+            entry = self._stats.setdefault(key, {
+                "profile": profile_name,
+                "model": model,
+                "calls": 0,
+                "fallback_calls": 0,
+                "total_latency": 0.0,
+                "max_latency": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            })
+            entry["calls"] += 1
+            entry["fallback_calls"] += 1 if fallback else 0
+            entry["total_latency"] += latency
+            entry["max_latency"] = max(entry["max_latency"], latency)
+            entry["prompt_tokens"] += prompt_tokens or 0
+            entry["completion_tokens"] += completion_tokens or 0
+
+    def summary(self):
+        """Return per-profile averages suitable for JSON output"""
+        with self._lock:
+            rows = []
+            for entry in self._stats.values():
+                calls = entry["calls"] or 1
+                rows.append({
+                    "profile": entry["profile"],
+                    "model": entry["model"],
+                    "calls": entry["calls"],
+                    "fallback_calls": entry["fallback_calls"],
+                    "avg_latency_ms": round(entry["total_latency"] / calls * 1000, 1),
+                    "max_latency_ms": round(entry["max_latency"] * 1000, 1),
+                    "avg_prompt_tokens": round(entry["prompt_tokens"] / calls, 1),
+                    "avg_completion_tokens": round(entry["completion_tokens"] / calls, 1),
+                })
+        return sorted(rows, key=lambda row: (row["profile"], row["model"]))
+
+
+class InFlightCounter:
+    """Counts concurrent generations per profile across all worker processes
+
+    Each generation holds an exclusive flock on one of the profile's slot files.
+    When every slot is taken the profile is overloaded and should shed load to its
+    fallback model. Locks are released by the OS if a worker dies mid-call.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def acquire(self, profile_name, slots):
+        """Take a free slot and return its handle, or None if all slots are busy"""
+        if fcntl is None:
+            return _local_slots.acquire(profile_name, slots)
+        os.makedirs(self.directory, exist_ok=True)
+        for slot in range(slots):
+            path = os.path.join(self.directory, f"{profile_name.replace('/', '_')}.{slot}.lock")
+            fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except OSError:
+                os.close(fd)
+        return None
+
+    def release(self, handle):
+        if handle is None:
+            return
+        if fcntl is None:
+            _local_slots.release(handle)
+            return
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        os.close(handle)
+
+
+class _LocalSlots:
+    """Per-process fallback where flock is unavailable (e.g. Windows development)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def acquire(self, profile_name, slots):
+        with self._lock:
+            if self._counts.get(profile_name, 0) >= slots:
+                return None
+            self._counts[profile_name] = self._counts.get(profile_name, 0) + 1
+            return profile_name
+
+    def release(self, profile_name):
+        with self._lock:
+            self._counts[profile_name] = max(self._counts.get(profile_name, 1) - 1, 0)
+
+
+_local_slots = _LocalSlots()
+
+
+profile_stats = ProfileStats()
+in_flight = InFlightCounter(INFLIGHT_DIR)
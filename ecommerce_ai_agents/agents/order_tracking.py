@@ -1,10 +1,13 @@
 import sqlite3
+from datetime import datetime
 from .base_agent import BaseAgent
+from .deadline import DeadlineExceeded, degraded_responses
+from utils.serialization import Order, OrderItem
 
 class OrderTrackingAgent(BaseAgent):
     """Agent for tracking orders that uses SQLite database"""
     def __init__(self):
-        super().__init__()
+        super().__init__(profile="order_tracking")
         self.system_prompt = """
         You are an order tracking assistant for an e-commerce website.
         Your job is to help users find information about their orders.
@@ -49,37 +52,9 @@ class OrderTrackingAgent(BaseAgent):
                     WHERE pi.purchase_id = ?
                 """, (purchase_id,))
                 
-                items = [dict(item) for item in cursor.fetchall()]
+                items = [OrderItem.from_row(item) for item in cursor.fetchall()]
                 
-                # Get shipping status (this is a simplified example)
-                # In a real system, you might have a shipping_status table
-                # For now, just simulate some status logic based on purchase date
-                from datetime import datetime, timedelta
-                purchase_date = datetime.fromisoformat(purchase_dict['purchase_date'].replace('Z', '+00:00'))
-                current_date = datetime.now()
-                
-                days_since_purchase = (current_date - purchase_date).days
-                
-                if days_since_purchase < 1:
-                    status = "Processing"
-                elif days_since_purchase < 3:
-                    status = "Shipped"
-                else:
-                    status = "Delivered"
-                
-                # Build complete order info - make it more UI friendly
-                order_info = {
-                    'order_id': purchase_id,
-                    'date': purchase_date.strftime("%b %d, %Y"),
-                    'total': purchase_dict['total_amount'],
-                    'status': status,
-                    'items': items,
-                    'formatted_date': purchase_date.strftime("%B %d, %Y"),
-                    'items_count': len(items),
-                    'estimated_delivery': (purchase_date + timedelta(days=5)).strftime("%b %d") if status != "Delivered" else "Delivered"
-                }
-                
-                orders.append(order_info)
+                orders.append(self.build_order(purchase_dict, items))
             
             conn.close()
             return orders
@@ -88,18 +63,86 @@ class OrderTrackingAgent(BaseAgent):
             print(f"Database error: {e}")
             return []
     
-    def process(self, user_id, message):
-        # Get user orders from database
-        orders = self.get_user_orders(user_id)
+    def build_order(self, purchase_dict, items):
+        """Build an Order from a purchases row, deriving its shipping status"""
+        # Get shipping status (this is a simplified example)
+        # In a real system, you might have a shipping_status table
+        # For now, just simulate some status logic based on purchase date
+        purchase_date = datetime.fromisoformat(purchase_dict['purchase_date'].replace('Z', '+00:00'))
+        current_date = datetime.now()
+        
+        days_since_purchase = (current_date - purchase_date).days
+        
+        if days_since_purchase < 1:
+            status = "Processing"
+        elif days_since_purchase < 3:
+            status = "Shipped"
+        else:
+            status = "Delivered"
+        
+        # Display fields (dates, item count, delivery estimate) are derived at serialization time
+        return Order(purchase_dict['id'], purchase_date, purchase_dict['total_amount'], status, items)
+    
+    def get_orders_for_users(self, user_ids, chunk_size=500):
+        """Get orders for many users at once, as {user_id: [Order, ...]}
+        
+        Purchases and their items are each fetched with one IN (...) query per chunk
+        of ids (SQLite limits the number of bound parameters per statement).
+        """
+        user_ids = sorted(set(user_ids))
+        orders_by_user = {user_id: [] for user_id in user_ids}
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            
+            purchases = []
+            for start in range(0, len(user_ids), chunk_size):
+                chunk = user_ids[start:start + chunk_size]
+                cursor.execute(f"""
+                    SELECT p.id, p.user_id, p.purchase_date, p.total_amount
+                    FROM purchases p
+                    WHERE p.user_id IN ({','.join('?' * len(chunk))})
+                    ORDER BY p.purchase_date DESC
+                """, chunk)
+                purchases.extend(dict(row) for row in cursor.fetchall())
+            
+            items_by_purchase = {purchase['id']: [] for purchase in purchases}
+            purchase_ids = list(items_by_purchase)
+            for start in range(0, len(purchase_ids), chunk_size):
+                chunk = purchase_ids[start:start + chunk_size]
+                cursor.execute(f"""
+                    SELECT pi.purchase_id, pi.product_id as name, pi.quantity, pi.price_at_purchase
+                    FROM purchase_items pi
+                    WHERE pi.purchase_id IN ({','.join('?' * len(chunk))})
+                """, chunk)
+                for item in cursor.fetchall():
+                    items_by_purchase[item['purchase_id']].append(OrderItem.from_row(item))
+            
+            conn.close()
+            
+            # Purchases are already newest first, as in get_user_orders
+            for purchase in purchases:
+                orders_by_user[purchase['user_id']].append(self.build_order(purchase, items_by_purchase[purchase['id']]))
+            return orders_by_user
+            
+        except Exception as e:
+            print(f"Database error: {e}")
+            return orders_by_user
+    
+    def process(self, user_id, message, deadline=None, orders=None):
+        # Get user orders from database, unless the caller already fetched them in bulk
+        if orders is None:
+            orders = self.get_user_orders(user_id)
         
         # Build context with order information
         order_context = ""
         if orders:
             order_context = "Here are the recent orders for this user:\n"
             for i, order in enumerate(orders, 1):
-                order_context += f"{i}. Order #{order['order_id']} - Status: {order['status']} - Placed on: {order['formatted_date']}\n"
-                order_context += f"   Total: ${order['total']:.2f}\n"
-                order_context += f"   Items: {', '.join([f'{item['name']} (x{item['quantity']})' for item in order['items']])}\n"
+                order_context += f"{i}. Order #{order.order_id} - Status: {order.status} - Placed on: {order.formatted_date}\n"
+                order_context += f"   Total: ${order.total:.2f}\n"
+                order_context += f"   Items: {', '.join([f'{item.name} (x{item.quantity})' for item in order.items])}\n"
         else:
             order_context = "No orders found for this user."
         
@@ -119,12 +162,23 @@ class OrderTrackingAgent(BaseAgent):
         Important: Make sure to mention that the user can click on any order card to view complete details in their account page.
         """
         
-        ai_response = self.get_completion(prompt, self.system_prompt)
+        degraded = False
+        try:
+            ai_response = self.get_completion(prompt, self.system_prompt, deadline=deadline)
+        except DeadlineExceeded:
+            # Keep the orders we already fetched and skip the model's summary
+            degraded = True
+            degraded_responses.increment("order_tracking")
+            if orders:
+                ai_response = f"Here are your {len(orders)} most recent orders. Click on any order card to view complete details in your account."
+            else:
+                ai_response = "I couldn't find any orders for your account."
         
         # Adjust response payload to include enhanced order data for UI
         return {
             "message": ai_response,
             "orders": orders,
             "agent_type": "order_tracking",
-            "suggested_actions": ["View all orders in my account", "Track my latest order"]
+            "suggested_actions": ["View all orders in my account", "Track my latest order"],
+            "degraded": degraded
         }
\ No newline at end of file
@@ -1,13 +1,32 @@
 # agents/product_recommendation.py
 from .base_agent import BaseAgent
+from .deadline import DeadlineExceeded, degraded_responses
+from utils.serialization import Product
+from .filter_extraction import FilterExtractor, DEFAULT_CATEGORY_SYNONYMS
+from utils.catalog_snapshot import catalog_snapshot
 import json
-import re
 import sqlite3
+import time
+
+DEFAULT_DB_PATH = r"C:\Users\jatin\Desktop\Projects\Accenture hackathon\Database.sqlite"
+
+# How often category synonyms are re-read from the database, in seconds
+SYNONYM_REFRESH_SECONDS = 60
+
+# Used when neither the catalog snapshot nor the database has categories
+DEFAULT_CATEGORIES = [
+    {"id": 1, "name": "Books", "slug": "books"},
+    {"id": 2, "name": "Fashion", "slug": "fashion"},
+    {"id": 3, "name": "Fitness", "slug": "fitness"},
+    {"id": 4, "name": "Electronics", "slug": "electronics"},
+    {"id": 5, "name": "Home Decor", "slug": "home-decor"},
+    {"id": 6, "name": "Beauty", "slug": "beauty"}
+]
 
 class ProductRecommendationAgent(BaseAgent):
     """Agent for product recommendations"""
-    def __init__(self, db_path=r"C:\Users\jatin\Desktop\Projects\Accenture hackathon\Database.sqlite"):
-        super().__init__()
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        super().__init__(profile="product_recommendation")
         self.system_prompt = """
         You are a product recommendation assistant for an e-commerce website.
         Your job is to understand what products the user might be interested in and provide helpful recommendations.
@@ -27,16 +46,30 @@ class ProductRecommendationAgent(BaseAgent):
         3. Tell the user you're updating their view with relevant products
         """
         self.db_path = db_path
-        
-        # Hardcoded categories
-        self.categories = [
-            {"id": 1, "name": "Books", "slug": "books"},
-            {"id": 2, "name": "Fashion", "slug": "fashion"},
-            {"id": 3, "name": "Fitness", "slug": "fitness"},
-            {"id": 4, "name": "Electronics", "slug": "electronics"},
-            {"id": 5, "name": "Home Decor", "slug": "home-decor"},
-            {"id": 6, "name": "Beauty", "slug": "beauty"}
-        ]
+        self.db_categories = self.load_categories()
+        self.synonyms = self.load_category_synonyms()
+        self._synonyms_loaded_at = time.monotonic()
+        self._extractor = None
+        self._extractor_categories = None
+
+    @property
+    def categories(self):
+        """Categories from the shared catalog snapshot, if one has been built"""
+        snapshot = catalog_snapshot.get()
+        return snapshot.categories() if snapshot else self.db_categories
+
+    def load_categories(self):
+        """Load categories from the database"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name, slug FROM categories ORDER BY id")
+            categories = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return categories or DEFAULT_CATEGORIES
+        except sqlite3.Error:
+            return DEFAULT_CATEGORIES
 
     def search_products(self, query):
         """Simple search for products matching query terms using SQLite"""
@@ -54,17 +87,15 @@ class ProductRecommendationAgent(BaseAgent):
             
             results = []
             for row in cursor.fetchall():
-                product = dict(row)
+                product = Product.from_row(row)
                 
                 # Get category name
-                category_name = "Uncategorized"
-                if product.get('category_id'):
+                if product.category_id:
                     for category in self.categories:
-                        if category['id'] == product['category_id']:
-                            category_name = category['name']
+                        if category['id'] == product.category_id:
+                            product.category = category['name']
                             break
                 
-                product['category'] = category_name
                 results.append(product)
             
             conn.close()
@@ -73,77 +104,56 @@ class ProductRecommendationAgent(BaseAgent):
         except sqlite3.Error:
             return []  # Return empty list if database error
     
+    def load_category_synonyms(self):
+        """Load category synonyms from the database, as {slug: [term, ...]}"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT c.slug, s.term FROM category_synonyms s
+                JOIN categories c ON c.id = s.category_id
+                ORDER BY s.id
+            """)
+            synonyms = {}
+            for slug, term in cursor.fetchall():
+                synonyms.setdefault(slug, []).append(term)
+            conn.close()
+            return synonyms
+        except sqlite3.Error:
+            return DEFAULT_CATEGORY_SYNONYMS
+
     def extract_filter_criteria(self, message):
         """Extract filtering criteria from user message"""
-        message = message.lower()
-        filter_command = {"action": "filter"}
-        
-        # Extract categories
-        category_matches = []
-        for category in self.categories:
-            if category['name'].lower() in message:
-                category_matches.append(category['slug'])
-        
-        if category_matches:
-            filter_command["categories"] = category_matches
-        
-        # Extract price range
-        price_pattern = r"under\s+\$?(\d+)|less than\s+\$?(\d+)|below\s+\$?(\d+)|cheaper than\s+\$?(\d+)"
-        max_price_match = re.search(price_pattern, message)
-        if max_price_match:
-            max_price = next(group for group in max_price_match.groups() if group is not None)
-            filter_command["priceRange"] = [0, int(max_price)]
-        
-        price_range_pattern = r"between\s+\$?(\d+)\s+and\s+\$?(\d+)"
-        price_range_match = re.search(price_range_pattern, message)
-        if price_range_match:
-            filter_command["priceRange"] = [int(price_range_match.group(1)), int(price_range_match.group(2))]
-        
-        # Extract sorting preference
-        if "cheap" in message or "lowest price" in message or "price low" in message:
-            filter_command["sort"] = "price-asc"
-        elif "expensive" in message or "highest price" in message or "price high" in message:
-            filter_command["sort"] = "price-desc"
-        elif "newest" in message or "latest" in message or "recent" in message:
-            filter_command["sort"] = "newest"
-        elif "popular" in message or "best rated" in message or "top rated" in message:
-            filter_command["sort"] = "rating"
-        
-        # Extract search query
-        search_terms = []
-        skip_words = ["show", "display", "find", "looking", "for", "me", "want", "need", "products", "items", "under", "over", "between", "and", "less", "than", "more", "cheap", "expensive", "newest", "popular", "best"]
-        
-        words = message.lower().split()
-        for word in words:
-            word = re.sub(r'[^\w\s]', '', word)  # Remove punctuation
-            if word and word not in skip_words and len(word) > 2:
-                search_terms.append(word)
-        
-        if search_terms:
-            filter_command["search"] = " ".join(search_terms)
-        
-        # Extract view preference
-        if "compact" in message or "list" in message:
-            filter_command["view"] = "compact"
-        elif "grid" in message or "tiles" in message:
-            filter_command["view"] = "grid"
-        
-        return filter_command
+        # Synonyms are not in the catalog snapshot, so re-read them periodically
+        if time.monotonic() - self._synonyms_loaded_at > SYNONYM_REFRESH_SECONDS:
+            self._synonyms_loaded_at = time.monotonic()
+            synonyms = self.load_category_synonyms()
+            if synonyms != self.synonyms:
+                self.synonyms = synonyms
+                self._extractor = None
+        
+        # Rebuild the compiled extractor only when the categories or synonyms change
+        categories = self.categories
+        if self._extractor is None or self._extractor_categories is not categories:
+            self._extractor = FilterExtractor(categories, self.synonyms)
+            self._extractor_categories = categories
+        return self._extractor.extract(message)
 
-    def process(self, user_id, message):
+    def process(self, user_id, message, deadline=None, products=None):
         # Extract filtering criteria
         filter_command = self.extract_filter_criteria(message)
         should_navigate = len(filter_command) > 1  # More than just "action": "filter"
         
-        # Search for relevant products
-        products = self.search_products(message)
+        # Search for relevant products, unless the caller already did
+        if products is None:
+            products = self.search_products(message)
                 
         # Build context with product information
         product_context = ""
         if products:
             product_context = "Based on the query, these products might be relevant:\n"
             for i, product in enumerate(products, 1):
-                product_context += f"{i}. {product['name']} - ${product['price']} - {product['category']}\n"
+                product_context += f"{i}. {product.name} - ${product.price} - {product.category}\n"
         
         # Generate response
         prompt = f"""
@@ -154,12 +164,25 @@ class ProductRecommendationAgent(BaseAgent):
         Provide a helpful response about these products. If the user is searching or browsing with specific criteria, 
         mention that you're updating their view to show matching products.
         """
-        ai_response = self.get_completion(prompt, self.system_prompt)
+        degraded = False
+        try:
+            ai_response = self.get_completion(prompt, self.system_prompt, deadline=deadline)
+        except DeadlineExceeded:
+            # Products and filters are already computed, so return them without the model's reply
+            degraded = True
+            degraded_responses.increment("product_recommendation")
+            if should_navigate:
+                ai_response = "I'm updating your view to show matching products."
+            elif products:
+                ai_response = "Here are some products that might interest you."
+            else:
+                ai_response = "I couldn't find matching products. Could you tell me a bit more about what you're looking for?"
                 
         return {
             "message": ai_response,
             "products": products,
             "agent_type": "product_recommendation",
             "filter_command": filter_command if should_navigate else None,
-            "should_navigate": should_navigate
+            "should_navigate": should_navigate,
+            "degraded": degraded
         }
\ No newline at end of file
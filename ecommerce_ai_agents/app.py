@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import json
 import os
@@ -7,11 +7,26 @@ from agents.intent_recognizer import IntentRecognizer
 from agents.product_recommendation import ProductRecommendationAgent
 from agents.order_tracking import OrderTrackingAgent
 from agents.customer_support import CustomerSupportAgent
+from agents.product_recommendation import DEFAULT_CATEGORIES
+from agents.filter_extraction import DEFAULT_CATEGORY_SYNONYMS
+from agents.model_profiles import profile_stats
+from agents.deadline import Deadline, degraded_responses
+from agents.batch import BatchChatProcessor
+from utils.serialization import json_response, encode
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Next.js frontend
 
+# Time budget for a single chat request, in seconds. Clients may ask for less via deadlineMs.
+CHAT_DEADLINE_SECONDS = float(os.environ.get('CHAT_DEADLINE_SECONDS', '20'))
+# Share of the budget intent recognition may use, leaving the rest for the specialized agent
+INTENT_BUDGET_SHARE = 0.3
+
+# Batch chat limits
+MAX_BATCH_ITEMS = 10000
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '4'))
+
 # Setup database if needed
 def setup_database():
     db_path = r'C:\Users\jatin\Desktop\Projects\Accenture hackathon\Database.sqlite'
@@ -90,6 +105,56 @@ def setup_database():
             
         except Exception as e:
             print(f"Error setting up database: {e}")
+    
+    # Existing databases get the category tables too
+    setup_category_tables(db_path)
+
+def setup_category_tables(db_path):
+    """Create and seed the categories and category_synonyms tables if they are missing or empty"""
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS categories (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                slug TEXT NOT NULL UNIQUE
+            )
+        ''')
+        
+        # Extra terms that select a category when filtering products
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS category_synonyms (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category_id INTEGER NOT NULL,
+                term TEXT NOT NULL,
+                FOREIGN KEY (category_id) REFERENCES categories (id)
+            )
+        ''')
+        
+        cursor.execute("SELECT COUNT(*) FROM categories")
+        if cursor.fetchone()[0] == 0:
+            print("Adding default categories")
+            for category in DEFAULT_CATEGORIES:
+                cursor.execute("INSERT INTO categories (id, name, slug) VALUES (?, ?, ?)",
+                               (category['id'], category['name'], category['slug']))
+        
+        # Seed synonyms for whichever default slugs the categories table has
+        cursor.execute("SELECT COUNT(*) FROM category_synonyms")
+        if cursor.fetchone()[0] == 0:
+            print("Adding default category synonyms")
+            cursor.execute("SELECT id, slug FROM categories")
+            for category_id, slug in cursor.fetchall():
+                for term in DEFAULT_CATEGORY_SYNONYMS.get(slug, []):
+                    cursor.execute("INSERT INTO category_synonyms (category_id, term) VALUES (?, ?)",
+                                   (category_id, term))
+        
+        conn.commit()
+        conn.close()
+        
+    except Exception as e:
+        print(f"Error setting up category tables: {e}")
 
 # Initialize agents
 setup_database()
@@ -97,6 +162,7 @@ intent_recognizer = IntentRecognizer()
 product_agent = ProductRecommendationAgent()
 order_agent = OrderTrackingAgent()
 support_agent = CustomerSupportAgent()
+batch_processor = BatchChatProcessor(intent_recognizer, product_agent, order_agent, support_agent, max_workers=BATCH_MAX_WORKERS)
 
 @app.route('/api/chat', methods=['POST'])
 def chat_endpoint():
@@ -114,22 +180,28 @@ def chat_endpoint():
         
     message = data.get('message', '')
     
+    # Start the request's time budget
+    budget = CHAT_DEADLINE_SECONDS
+    if str(data.get('deadlineMs', '')).isdigit():
+        budget = min(budget, int(data['deadlineMs']) / 1000)
+    deadline = Deadline(budget)
+    
     print(f"Received message: '{message}' from user: {user_id} (numeric ID: {numeric_user_id})")
     
     # Recognize intent
-    intent = intent_recognizer.recognize(message)
+    intent = intent_recognizer.recognize(message, deadline=deadline.capped(budget * INTENT_BUDGET_SHARE))
     print(f"Recognized intent: {intent}")
     
     # Route to appropriate agent
     if intent == 'product_search':
-        response = product_agent.process(numeric_user_id, message)
+        response = product_agent.process(numeric_user_id, message, deadline=deadline)
         # Pass through filter_command and should_navigate if they exist
         if 'filter_command' in response and 'should_navigate' in response:
             pass  # Keep these fields in the response
     elif intent == 'order_status':
-        response = order_agent.process(numeric_user_id, message)
+        response = order_agent.process(numeric_user_id, message, deadline=deadline)
     elif intent == 'customer_support':
-        response = support_agent.process(numeric_user_id, message)
+        response = support_agent.process(numeric_user_id, message, deadline=deadline)
     else:
         # Default to general response if intent unclear
         response = {
@@ -138,7 +210,29 @@ def chat_endpoint():
         }
     
     print(f"Response: {response}")
-    return jsonify(response)
+    # Optional projection, e.g. "fields": "compact" or {"orders": ["order_id", "status"]}
+    return json_response(response, data.get('fields'), request.headers.get('Accept-Encoding'))
+
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch_endpoint():
+    """Process many chat messages, streaming one JSON line per message as it completes"""
+    data = request.json or {}
+    items = data.get('items', [])
+    if not isinstance(items, list) or len(items) > MAX_BATCH_ITEMS or not all(
+            isinstance(item, dict)
+            and isinstance(item.get('message', ''), str)
+            and isinstance(item.get('userId', 'anonymous'), str)
+            for item in items):
+        return jsonify({"error": f"items must be a list of at most {MAX_BATCH_ITEMS} objects with string userId and message"}), 400
+    
+    fields = data.get('fields')
+    print(f"Received batch of {len(items)} messages")
+    
+    def generate():
+        for result in batch_processor.run(items):
+            yield encode(result, fields) + b"\n"
+    
+    return Response(generate(), mimetype='application/x-ndjson')
 
 @app.route('/api/products', methods=['GET'])
 def get_products():
@@ -169,10 +263,25 @@ def get_orders(user_id):
         # Create a new instance to avoid potential threading issues
         order_tracker = OrderTrackingAgent()
         user_orders = order_tracker.get_user_orders(numeric_user_id)
-        return jsonify(user_orders)
+        
+        # ?fields=compact or ?fields=order_id,status,total
+        fields = request.args.get('fields')
+        if fields and fields != 'compact':
+            fields = {"orders": fields.split(',')}
+        return json_response(user_orders, fields, request.headers.get('Accept-Encoding'))
     except Exception as e:
         print(f"Error loading orders: {e}")
         return jsonify([])
 
+@app.route('/api/metrics/profiles', methods=['GET'])
+def get_profile_metrics():
+    """Endpoint to compare latency and token counts per model profile"""
+    return jsonify(profile_stats.summary())
+
+@app.route('/api/metrics/deadlines', methods=['GET'])
+def get_deadline_metrics():
+    """Endpoint to report how many chat responses were degraded by the deadline"""
+    return jsonify(degraded_responses.summary())
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=3000)
\ No newline at end of file
@@ -0,0 +1,43 @@
+# gunicorn.conf.py
+# Run with: gunicorn -c gunicorn.conf.py app:app
+import os
+
+from utils.catalog_snapshot import DEFAULT_SNAPSHOT_PATH, build_snapshot, load_catalog
+from agents.product_recommendation import DEFAULT_CATEGORIES, DEFAULT_DB_PATH
+
+bind = "0.0.0.0:3000"
+workers = int(os.environ.get('GUNICORN_WORKERS', '4'))
+
+# Threaded workers heartbeat from their main loop rather than between requests,
+# so a long streamed /api/chat/batch response is not killed after `timeout`
+worker_class = "gthread"
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Import the app (and map the catalog snapshot) in the master, so workers
+# inherit the mapping instead of each loading its own copy
+preload_app = True
+
+
+def build_catalog_snapshot():
+    """Build the catalog snapshot if none exists yet"""
+    if os.path.exists(DEFAULT_SNAPSHOT_PATH):
+        return
+    os.makedirs(os.path.dirname(DEFAULT_SNAPSHOT_PATH) or '.', exist_ok=True)
+    categories, faqs = load_catalog(DEFAULT_DB_PATH, 'data/support_faq.json', DEFAULT_CATEGORIES)
+    build_id = build_snapshot(DEFAULT_SNAPSHOT_PATH, categories, faqs)
+    print(f"Built catalog snapshot {build_id}")
+
+
+def try_build_catalog_snapshot():
+    """Build the snapshot, but never stop gunicorn from starting over it"""
+    try:
+        build_catalog_snapshot()
+    except Exception as e:
+        # The agents fall back to the database and FAQ file without a snapshot
+        print(f"Could not build catalog snapshot, starting without it: {e}")
+
+
+# This file is executed before the arbiter preloads the app (Arbiter.setup), whereas
+# hooks like on_starting only run afterwards, so the snapshot must be built here for
+# the agents created at import time to find it
+try_build_catalog_snapshot()
@@ -0,0 +1,235 @@
+# utils/catalog_snapshot.py
+"""
+Read-only binary snapshot of the catalog categories and support FAQ.
+
+The snapshot is built once and memory-mapped by every gunicorn worker, so the
+pages are shared through the OS page cache instead of each worker holding its
+own Python copy. Lookups read fixed-size records straight from the mapping.
+
+Layout (little-endian):
+    header    magic b"SSFS", format version, build id, section count
+    sections  (name, offset, length) for each section below
+    strings   UTF-8 heap referenced by (offset, length) pairs
+    cats      category records: id, name, slug
+    faqtext   lowercased FAQ questions separated by NUL, searched with mmap.find
+    faqs      FAQ records: position in the FAQ file, faqtext offset/length, question, answer
+
+Rebuilds write a temporary file and os.replace() it over the old one; readers
+notice the new inode and remap, while requests still holding the old mapping
+finish against it.
+
+    python -m utils.catalog_snapshot --out data/catalog.snapshot
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+
+MAGIC = b"SSFS"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<4sIQI")
+SECTION = struct.Struct("<8sQQ")
+CATEGORY = struct.Struct("<I4I")
+FAQ = struct.Struct("<I6I")
+
+DEFAULT_SNAPSHOT_PATH = os.environ.get('CATALOG_SNAPSHOT_PATH', 'data/catalog.snapshot')
+
+
+class _StringHeap:
+    """Collects strings for the snapshot, deduplicating repeats"""
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = {}
+
+    def add(self, text):
+        encoded = (text or "").encode("utf-8")
+        if encoded not in self.offsets:
+            self.offsets[encoded] = len(self.data)
+            self.data += encoded
+        return self.offsets[encoded], len(encoded)
+
+
+def build_snapshot(path, categories, faqs):
+    """Write a new snapshot atomically and return its build id"""
+    heap = _StringHeap()
+
+    cats = bytearray()
+    for category in categories:
+        cats += CATEGORY.pack(category['id'], *heap.add(category['name']), *heap.add(category['slug']))
+
+    faq_text = bytearray()
+    faq_records = bytearray()
+    for index, faq in enumerate(faqs):
+        # FAQ entries need not have an id, so records are numbered by position
+        question = faq['question'].lower().encode("utf-8")
+        faq_records += FAQ.pack(index, len(faq_text), len(question),
+                                *heap.add(faq['question']), *heap.add(faq['answer']))
+        faq_text += question + b"\x00"
+
+    sections = [(b"strings", heap.data), (b"cats", cats), (b"faqtext", faq_text), (b"faqs", faq_records)]
+    build_id = time.time_ns()
+
+    offset = HEADER.size + SECTION.size * len(sections)
+    table = bytearray()
+    for name, data in sections:
+        table += SECTION.pack(name, offset, len(data))
+        offset += len(data)
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, build_id, len(sections)))
+        f.write(table)
+        for _, data in sections:
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return build_id
+
+
+class CatalogSnapshot:
+    """Memory-mapped, read-only view of one snapshot file"""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.build_id, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog snapshot: {path}")
+
+        self._sections = {}
+        for i in range(count):
+            name, offset, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            self._sections[name.rstrip(b"\x00").decode()] = (offset, length)
+
+        self._strings_offset = self._sections['strings'][0]
+        self._categories = None
+
+    def _string(self, offset, length):
+        start = self._strings_offset + offset
+        return self._mmap[start:start + length].decode("utf-8")
+
+    def _records(self, section, record):
+        offset, length = self._sections[section]
+        return offset, length // record.size
+
+    def categories(self):
+        """Category list in the same shape as ProductRecommendationAgent.categories"""
+        if self._categories is None:
+            offset, count = self._records('cats', CATEGORY)
+            categories = []
+            for i in range(count):
+                category_id, name_off, name_len, slug_off, slug_len = CATEGORY.unpack_from(self._mmap, offset + i * CATEGORY.size)
+                categories.append({"id": category_id, "name": self._string(name_off, name_len),
+                                   "slug": self._string(slug_off, slug_len)})
+            self._categories = categories
+        return self._categories
+
+    def search_faq(self, query):
+        """Return the answer of the first FAQ whose question contains the query"""
+        needle = query.lower().encode("utf-8")
+        if not needle or b"\x00" in needle:
+            return None
+
+        text_offset, text_length = self._sections['faqtext']
+        position = self._mmap.find(needle, text_offset, text_offset + text_length)
+        if position < 0:
+            return None
+
+        # Find the FAQ whose question starts at or before the match
+        offset, count = self._records('faqs', FAQ)
+        starts = _RecordField(self._mmap, offset, count, FAQ.size, 4)
+        index = bisect.bisect_right(starts, position - text_offset) - 1
+        _, _, _, _, _, answer_off, answer_len = FAQ.unpack_from(self._mmap, offset + index * FAQ.size)
+        return self._string(answer_off, answer_len)
+
+
+class _RecordField:
+    """Sequence view of one uint32 field across fixed-size records, for bisect"""
+    def __init__(self, buffer, offset, count, record_size, field_offset):
+        self.buffer = buffer
+        self.offset = offset + field_offset
+        self.count = count
+        self.record_size = record_size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return struct.unpack_from("<I", self.buffer, self.offset + index * self.record_size)[0]
+
+
+class SharedSnapshot:
+    """Process-wide handle that remaps the snapshot when a rebuild replaces the file"""
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._last_check = 0.0
+
+    def get(self):
+        """Return the current snapshot, or None if none has been built"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            self._last_check = now
+            try:
+                inode = os.stat(self.path).st_ino
+            except OSError:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.inode != inode:
+                try:
+                    self._snapshot = CatalogSnapshot(self.path)
+                    print(f"Loaded catalog snapshot {self._snapshot.build_id}")
+                except (OSError, ValueError) as e:
+                    print(f"Error loading catalog snapshot: {e}")
+            return self._snapshot
+
+
+catalog_snapshot = SharedSnapshot()
+
+
+def load_catalog(db_path, faq_path, default_categories):
+    """Read categories and FAQs from the database and FAQ file"""
+    categories, faqs = default_categories, []
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name, slug FROM categories ORDER BY id")
+        categories = [dict(row) for row in cursor.fetchall()] or default_categories
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+
+    try:
+        with open(faq_path, 'r') as f:
+            faqs = json.load(f)
+    except Exception as e:
+        print(f"Could not load FAQ data: {e}")
+
+    return categories, faqs
+
+
+if __name__ == '__main__':
+    from agents.product_recommendation import DEFAULT_CATEGORIES, DEFAULT_DB_PATH
+
+    parser = argparse.ArgumentParser(description="Build the shared catalog snapshot")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database path")
+    parser.add_argument('--faq', default='data/support_faq.json', help="Support FAQ JSON file")
+    parser.add_argument('--out', default=DEFAULT_SNAPSHOT_PATH, help="Snapshot file to (re)write")
+    args = parser.parse_args()
+
+    categories, faqs = load_catalog(args.db, args.faq, DEFAULT_CATEGORIES)
+    build_id = build_snapshot(args.out, categories, faqs)
+    print(f"Wrote snapshot {build_id}: {len(categories)} categories, {len(faqs)} FAQs")
@@ -0,0 +1,125 @@
+# utils/filter_extraction_benchmark.py
+"""
+Throughput and parity check for ProductRecommendationAgent.extract_filter_criteria.
+
+Runs every message in utils/filter_golden_corpus.json through the compiled
+FilterExtractor and through the previous regex/substring implementation
+(kept below for comparison), checks the extractor against the expected
+output of each case, and reports messages per second for both.
+
+Cases marked with "legacy_differs" are ones where the old implementation
+was wrong or lacked a feature (synonyms, "$1k" prices, substring false
+positives); all other cases must match it exactly.
+
+    python -m utils.filter_extraction_benchmark --repeat 200
+"""
+import argparse
+import json
+import re
+import sys
+import time
+
+from agents.filter_extraction import FilterExtractor, DEFAULT_CATEGORY_SYNONYMS
+from agents.product_recommendation import DEFAULT_CATEGORIES
+
+CORPUS_PATH = 'utils/filter_golden_corpus.json'
+
+def legacy_extract_filter_criteria(message, categories=DEFAULT_CATEGORIES):
+    """Previous implementation of extract_filter_criteria, unchanged"""
+    message = message.lower()
+    filter_command = {"action": "filter"}
+
+    # Extract categories
+    category_matches = []
+    for category in categories:
+        if category['name'].lower() in message:
+            category_matches.append(category['slug'])
+
+    if category_matches:
+        filter_command["categories"] = category_matches
+
+    # Extract price range
+    price_pattern = r"under\s+\$?(\d+)|less than\s+\$?(\d+)|below\s+\$?(\d+)|cheaper than\s+\$?(\d+)"
+    max_price_match = re.search(price_pattern, message)
+    if max_price_match:
+        max_price = next(group for group in max_price_match.groups() if group is not None)
+        filter_command["priceRange"] = [0, int(max_price)]
+
+    price_range_pattern = r"between\s+\$?(\d+)\s+and\s+\$?(\d+)"
+    price_range_match = re.search(price_range_pattern, message)
+    if price_range_match:
+        filter_command["priceRange"] = [int(price_range_match.group(1)), int(price_range_match.group(2))]
+
+    # Extract sorting preference
+    if "cheap" in message or "lowest price" in message or "price low" in message:
+        filter_command["sort"] = "price-asc"
+    elif "expensive" in message or "highest price" in message or "price high" in message:
+        filter_command["sort"] = "price-desc"
+    elif "newest" in message or "latest" in message or "recent" in message:
+        filter_command["sort"] = "newest"
+    elif "popular" in message or "best rated" in message or "top rated" in message:
+        filter_command["sort"] = "rating"
+
+    # Extract search query
+    search_terms = []
+    skip_words = ["show", "display", "find", "looking", "for", "me", "want", "need", "products", "items", "under", "over", "between", "and", "less", "than", "more", "cheap", "expensive", "newest", "popular", "best"]
+
+    words = message.lower().split()
+    for word in words:
+        word = re.sub(r'[^\w\s]', '', word)  # Remove punctuation
+        if word and word not in skip_words and len(word) > 2:
+            search_terms.append(word)
+
+    if search_terms:
+        filter_command["search"] = " ".join(search_terms)
+
+    # Extract view preference
+    if "compact" in message or "list" in message:
+        filter_command["view"] = "compact"
+    elif "grid" in message or "tiles" in message:
+        filter_command["view"] = "grid"
+
+    return filter_command
+
+def throughput(func, messages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            func(message)
+    elapsed = time.perf_counter() - start
+    return round(len(messages) * repeat / elapsed)
+
+def run_benchmark(repeat=200, corpus_path=CORPUS_PATH):
+    with open(corpus_path, 'r') as f:
+        corpus = json.load(f)
+
+    extractor = FilterExtractor(DEFAULT_CATEGORIES, DEFAULT_CATEGORY_SYNONYMS)
+    failures = []
+    legacy_mismatches = []
+    for case in corpus:
+        result = extractor.extract(case['message'])
+        if result != case['expected']:
+            failures.append({"message": case['message'], "expected": case['expected'], "got": result})
+        if "legacy_differs" not in case and legacy_extract_filter_criteria(case['message']) != case['expected']:
+            legacy_mismatches.append(case['message'])
+
+    messages = [case['message'] for case in corpus]
+    return {
+        "cases": len(corpus),
+        "intended_differences": sum(1 for case in corpus if "legacy_differs" in case),
+        "failures": failures,
+        "legacy_mismatches": legacy_mismatches,
+        "legacy_msgs_per_sec": throughput(legacy_extract_filter_criteria, messages, repeat),
+        "compiled_msgs_per_sec": throughput(extractor.extract, messages, repeat),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark filter extraction against the golden corpus")
+    parser.add_argument('--repeat', type=int, default=200, help="Passes over the corpus per implementation")
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    args = parser.parse_args()
+
+    report = run_benchmark(args.repeat, args.corpus)
+    print(json.dumps(report, indent=2))
+    if report["failures"] or report["legacy_mismatches"]:
+        sys.exit(1)
@@ -0,0 +1,56 @@
+# utils/profile_benchmark.py
+"""
+Compare latency and token counts across model profiles.
+
+Runs a few representative prompts through each agent's profile and, for
+comparison, through the old shared settings (temperature 0.7, num_ctx 2048,
+no num_predict cap). Requires a running Ollama server.
+
+    python -m utils.profile_benchmark --runs 5
+"""
+import argparse
+import json
+
+from agents.base_agent import BaseAgent
+from agents.intent_recognizer import IntentRecognizer
+from agents.product_recommendation import ProductRecommendationAgent
+from agents.order_tracking import OrderTrackingAgent
+from agents.customer_support import CustomerSupportAgent
+from agents.model_profiles import profile_stats
+
+SAMPLE_PROMPTS = {
+    "intent_recognizer": "Classify this message into one of the allowed categories: Where is my order?",
+    "product_recommendation": "User: show me cheap headphones under $50\n\nProvide a helpful response about these products.",
+    "order_tracking": "User: when will my package arrive?\n\nOrder information: 1. Order #2 - Status: Shipped - Placed on: April 02, 2025",
+    "customer_support": "User support request: How do I return an item?\n\nProvide a helpful customer support response.",
+}
+
+def build_agents():
+    return {
+        "intent_recognizer": IntentRecognizer(),
+        "product_recommendation": ProductRecommendationAgent(),
+        "order_tracking": OrderTrackingAgent(),
+        "customer_support": CustomerSupportAgent(),
+    }
+
+def run_benchmark(runs=3):
+    """Run each sample prompt with its tuned profile and with the shared baseline profile"""
+    for name, agent in build_agents().items():
+        # Unknown profile names resolve to the old shared model and options, tracked under their own key
+        baseline = BaseAgent(model="gemma:2b", profile=f"baseline/{name}")
+        baseline.options = {'temperature': 0.7, 'num_ctx': 2048}
+
+        prompt = SAMPLE_PROMPTS[name]
+        for _ in range(runs):
+            agent.get_completion(prompt, agent.system_prompt)
+            baseline.get_completion(prompt, agent.system_prompt)
+
+    return profile_stats.summary()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark per-agent model profiles")
+    parser.add_argument('--runs', type=int, default=3, help="Completions per profile")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.runs)
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,196 @@
+# utils/serialization.py
+import gzip
+import json
+from datetime import timedelta
+
+from flask import Response
+
+# Optional faster backends, used when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Payloads smaller than this are sent uncompressed
+COMPRESSION_THRESHOLD = 1024
+
+# Field sets the chat widget actually renders, selected with fields="compact"
+COMPACT_FIELDS = {
+    "orders": ("order_id", "date", "total", "status"),
+    "items": ("name", "quantity"),
+    "products": ("id", "name", "slug", "price", "category"),
+}
+
+
+def allowed(fields, known):
+    """Requested fields that the model exposes, or all of them when none were requested
+
+    Field names come from the client, so anything else (typos, methods, the raw
+    purchase_date) is dropped rather than looked up.
+    """
+    if not fields:
+        return known
+    return [field for field in fields if isinstance(field, str) and field in known]
+
+
+class OrderItem:
+    """Line item of an order"""
+    __slots__ = ("name", "quantity", "price_at_purchase")
+
+    FIELDS = __slots__
+
+    def __init__(self, name, quantity, price_at_purchase):
+        self.name = name
+        self.quantity = quantity
+        self.price_at_purchase = price_at_purchase
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row["name"], row["quantity"], row["price_at_purchase"])
+
+    def to_dict(self, fields=None):
+        return {field: getattr(self, field) for field in allowed(fields, self.FIELDS)}
+
+
+class Order:
+    """Order with its items. Display dates and counts are derived only when serialized."""
+    __slots__ = ("order_id", "purchase_date", "total", "status", "items")
+
+    FIELDS = ("order_id", "date", "total", "status", "items", "formatted_date", "items_count", "estimated_delivery")
+
+    def __init__(self, order_id, purchase_date, total, status, items):
+        self.order_id = order_id
+        self.purchase_date = purchase_date
+        self.total = total
+        self.status = status
+        self.items = items
+
+    @property
+    def date(self):
+        return self.purchase_date.strftime("%b %d, %Y")
+
+    @property
+    def formatted_date(self):
+        return self.purchase_date.strftime("%B %d, %Y")
+
+    @property
+    def items_count(self):
+        return len(self.items)
+
+    @property
+    def estimated_delivery(self):
+        if self.status == "Delivered":
+            return "Delivered"
+        return (self.purchase_date + timedelta(days=5)).strftime("%b %d")
+
+    def to_dict(self, fields=None, item_fields=None):
+        result = {}
+        for field in allowed(fields, self.FIELDS):
+            if field == "items":
+                result["items"] = [item.to_dict(item_fields) for item in self.items]
+            else:
+                result[field] = getattr(self, field)
+        return result
+
+    def __repr__(self):
+        return f"Order({self.order_id}, {self.status}, {len(self.items)} items)"
+
+
+class Product:
+    """Product row plus its resolved category name"""
+    __slots__ = ("id", "name", "slug", "description", "price", "old_price", "rating",
+                 "review_count", "image_url", "category_id", "category", "extra", "row_columns")
+
+    COLUMNS = ("id", "name", "slug", "description", "price", "old_price", "rating",
+               "review_count", "image_url", "category_id")
+
+    def __init__(self, **values):
+        # Columns in the order the row had them, for the full representation
+        self.row_columns = tuple(values) if "category" in values else tuple(values) + ("category",)
+        for field in self.COLUMNS:
+            setattr(self, field, values.pop(field, None))
+        self.category = values.pop("category", "Uncategorized")
+        # Columns we don't model explicitly are passed through unchanged
+        self.extra = values
+
+    @classmethod
+    def from_row(cls, row, category="Uncategorized"):
+        values = dict(row)
+        values["category"] = category
+        return cls(**values)
+
+    def get(self, field):
+        if field in self.COLUMNS or field == "category":
+            return getattr(self, field)
+        return self.extra.get(field)
+
+    def to_dict(self, fields=None):
+        # Same keys as dict(row), including nulls, plus the category name
+        return {field: self.get(field) for field in allowed(fields, self.row_columns)}
+
+    def __repr__(self):
+        return f"Product({self.id}, {self.name!r})"
+
+
+def resolve_fields(fields):
+    """Normalize a request's `fields` value into per-model field lists"""
+    if fields == "compact":
+        return COMPACT_FIELDS
+    if isinstance(fields, dict):
+        return {key: tuple(value) for key, value in fields.items() if isinstance(value, (list, tuple))}
+    return {}
+
+
+def to_jsonable(payload, fields=None):
+    """Convert response models inside a chat/order payload into plain dicts, applying projection"""
+    fields = resolve_fields(fields)
+
+    def convert(value):
+        if isinstance(value, Order):
+            return value.to_dict(fields.get("orders"), fields.get("items"))
+        if isinstance(value, Product):
+            return value.to_dict(fields.get("products"))
+        if isinstance(value, OrderItem):
+            return value.to_dict(fields.get("items"))
+        if isinstance(value, list):
+            return [convert(item) for item in value]
+        if isinstance(value, dict):
+            return {key: convert(item) for key, item in value.items()}
+        return value
+
+    return convert(payload)
+
+
+def encode(payload, fields=None):
+    """Encode a payload to compact JSON bytes"""
+    data = to_jsonable(payload, fields)
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def compress(body, accept_encoding):
+    """Compress body using the best encoding the client accepts. Returns (body, encoding)."""
+    if len(body) < COMPRESSION_THRESHOLD:
+        return body, None
+    accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    if brotli is not None and "br" in accepted:
+        return brotli.compress(body, quality=4), "br"
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=5), "gzip"
+    return body, None
+
+
+def json_response(payload, fields=None, accept_encoding=None, status=200):
+    """Build a Flask JSON response with optional projection and compression"""
+    body, encoding = compress(encode(payload, fields), accept_encoding)
+    response = Response(body, status=status, mimetype="application/json")
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,80 @@
+# utils/serialization_benchmark.py
+"""
+Micro-benchmark for chat/order response serialization.
+
+Compares the previous path (full order dicts through json.dumps with sorted
+keys, as jsonify does) with the response models, with and without the
+compact projection, and reports encode time and bytes on the wire.
+
+    python -m utils.serialization_benchmark --orders 500
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from utils.serialization import Order, OrderItem, encode, compress, brotli
+
+def build_orders(num_orders, items_per_order=3):
+    """Generate Order models the way OrderTrackingAgent builds them"""
+    orders = []
+    start = datetime(2024, 1, 1)
+    for i in range(num_orders):
+        items = [
+            OrderItem(f"Product {random.randint(1, 500)}", random.randint(1, 3), round(random.uniform(5, 200), 2))
+            for _ in range(items_per_order)
+        ]
+        status = random.choice(["Processing", "Shipped", "Delivered"])
+        orders.append(Order(i + 1, start + timedelta(hours=i * 7), round(random.uniform(10, 600), 2), status, items))
+    return orders
+
+def legacy_encode(response):
+    """What jsonify did with the old dict payload"""
+    payload = dict(response, orders=[order.to_dict() for order in response["orders"]])
+    return json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+def time_it(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+def run_benchmark(num_orders=300, repeat=50):
+    response = {
+        "message": "Here are your most recent orders.",
+        "orders": build_orders(num_orders),
+        "agent_type": "order_tracking",
+        "suggested_actions": ["View all orders in my account", "Track my latest order"],
+    }
+
+    cases = [
+        ("legacy jsonify", lambda: legacy_encode(response)),
+        ("encode full", lambda: encode(response)),
+        ("encode compact", lambda: encode(response, "compact")),
+    ]
+
+    results = []
+    for name, func in cases:
+        ms, body = time_it(func, repeat)
+        row = {"case": name, "encode_ms": round(ms, 2), "bytes": len(body)}
+        gzip_ms, gzipped = time_it(lambda: gzip.compress(body, compresslevel=5), repeat)
+        row["gzip_bytes"] = len(gzipped)
+        row["gzip_ms"] = round(gzip_ms, 2)
+        if brotli is not None:
+            br_ms, compressed = time_it(lambda: compress(body, "br")[0], repeat)
+            row["br_bytes"] = len(compressed)
+            row["br_ms"] = round(br_ms, 2)
+        results.append(row)
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark chat response serialization")
+    parser.add_argument('--orders', type=int, default=300, help="Orders in the simulated response")
+    parser.add_argument('--repeat', type=int, default=50, help="Encodes per case")
+    args = parser.parse_args()
+
+    random.seed(0)
+    for row in run_benchmark(args.orders, args.repeat):
+        print(json.dumps(row))
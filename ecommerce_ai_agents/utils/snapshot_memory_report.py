@@ -0,0 +1,115 @@
+# utils/snapshot_memory_report.py
+"""
+Report per-worker memory with and without the shared catalog snapshot.
+
+Forks a number of workers (as gunicorn would) that either load their own
+Python copy of a synthetic category and FAQ list, or map the snapshot and run
+the same lookups against it. RSS counts shared pages in every worker; PSS
+splits them between the processes sharing them, so it is the better measure
+of what each worker really costs. Linux only (reads /proc).
+
+    python -m utils.snapshot_memory_report --faqs 1000 --workers 4
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from utils.catalog_snapshot import CatalogSnapshot, build_snapshot
+
+def memory_kb():
+    """Return (rss, pss) of the current process in kB"""
+    values = {}
+    for path in ('/proc/self/smaps_rollup', '/proc/self/status'):
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, rest = line.partition(':')
+                    if key in ('Rss', 'Pss', 'VmRSS'):
+                        values.setdefault(key, int(rest.split()[0]))
+        except OSError:
+            pass
+    rss = values.get('Rss', values.get('VmRSS', 0))
+    return rss, values.get('Pss', rss)
+
+def synthetic_catalog(num_faqs):
+    categories = [{"id": i, "name": f"Category {i}", "slug": f"category-{i}"} for i in range(1, 21)]
+    faqs = [{"id": i, "question": f"How do I handle case {i} for my order?",
+             "answer": f"For case {i}, open your account and follow the steps on the help page. " * 3}
+            for i in range(1, num_faqs + 1)]
+    return categories, faqs
+
+def worker(mode, catalog_path, json_path, write_fd, go_fd):
+    """Load the catalog the requested way, run lookups, then report memory"""
+    if mode == 'copy':
+        with open(json_path) as f:
+            catalog = json.load(f)
+        lookups = len(catalog['categories'])
+        faq_hits = sum(1 for faq in catalog['faqs'] if 'case 1' in faq['question'].lower())
+    else:
+        snapshot = CatalogSnapshot(catalog_path)
+        lookups = len(snapshot.categories())
+        faq_hits = 1 if snapshot.search_faq('case 1') else 0
+
+    # Let every sibling finish loading before measuring so shared pages are counted fairly
+    os.write(write_fd, b"r")
+    os.read(go_fd, 1)
+    rss, pss = memory_kb()
+    os.write(write_fd, json.dumps({"rss_kb": rss, "pss_kb": pss, "lookups": lookups, "faq_hits": faq_hits}).encode() + b"\n")
+    os._exit(0)
+
+def measure(mode, workers, catalog_path, json_path):
+    go_read, go_write = os.pipe()
+    result_files = []
+    pids = []
+    for _ in range(workers):
+        result_read, result_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            worker(mode, catalog_path, json_path, result_write, go_read)
+        os.close(result_write)
+        pids.append(pid)
+        result_files.append(os.fdopen(result_read, 'rb'))
+
+    # Each worker sends one "r" on its own pipe once loaded
+    for result_file in result_files:
+        result_file.read(1)
+    os.write(go_write, b"g" * workers)
+
+    results = [json.loads(result_file.readline()) for result_file in result_files]
+    for pid in pids:
+        os.waitpid(pid, 0)
+    os.close(go_read)
+    os.close(go_write)
+    return results
+
+def run_report(num_faqs, workers):
+    categories, faqs = synthetic_catalog(num_faqs)
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = os.path.join(tmp, 'catalog.snapshot')
+        json_path = os.path.join(tmp, 'catalog.json')
+        build_snapshot(catalog_path, categories, faqs)
+        with open(json_path, 'w') as f:
+            json.dump({"categories": categories, "faqs": faqs}, f)
+        del faqs
+
+        baseline_rss, baseline_pss = memory_kb()
+        report = {"baseline_kb": {"rss": baseline_rss, "pss": baseline_pss},
+                  "snapshot_bytes": os.path.getsize(catalog_path),
+                  "json_bytes": os.path.getsize(json_path)}
+        for mode in ('copy', 'snapshot'):
+            results = measure(mode, workers, catalog_path, json_path)
+            report[mode] = {
+                "avg_rss_kb": sum(r['rss_kb'] for r in results) // workers,
+                "avg_pss_kb": sum(r['pss_kb'] for r in results) // workers,
+                "lookups": results[0]['lookups'],
+            }
+    return report
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare worker memory with and without the catalog snapshot")
+    parser.add_argument('--faqs', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(json.dumps(run_report(args.faqs, args.workers), indent=2))